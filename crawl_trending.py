@@ -7,10 +7,18 @@ Fetches the top 5 trending repositories from GitHub and their README files.
 import requests
 from bs4 import BeautifulSoup
 import json
+import os
 import re
 from datetime import datetime
 import time
 
+from storage import README_UNAVAILABLE
+from search_index import open_index, index_repos
+from readme_store import save_snapshot
+from digest import record_crawl, format_rollups
+from static_site import publish_crawl
+from profiling import enable_profiling, profile_stage
+
 
 def fetch_trending_repos(limit=5):
     """
@@ -107,47 +115,57 @@ def fetch_repo_stats(repo_full_name):
     try:
         response = requests.get(url, headers=headers, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find stars count
-        stars = 0
-        stars_link = soup.find('a', href=lambda x: x and '/stargazers' in x)
-        if stars_link:
-            stars_text = stars_link.get_text(strip=True)
-            stars_match = re.search(r'([\d.]+)([kKmM])?', stars_text)
-            if stars_match:
-                num = float(stars_match.group(1))
-                suffix = stars_match.group(2)
-                if suffix:
-                    if suffix.lower() == 'k':
-                        num *= 1000
-                    elif suffix.lower() == 'm':
-                        num *= 1000000
-                stars = int(num)
-        
-        # Find forks count
-        forks = 0
-        forks_link = soup.find('a', href=lambda x: x and '/forks' in x)
-        if forks_link:
-            forks_text = forks_link.get_text(strip=True)
-            forks_match = re.search(r'([\d.]+)([kKmM])?', forks_text)
-            if forks_match:
-                num = float(forks_match.group(1))
-                suffix = forks_match.group(2)
-                if suffix:
-                    if suffix.lower() == 'k':
-                        num *= 1000
-                    elif suffix.lower() == 'm':
-                        num *= 1000000
-                forks = int(num)
-        
-        return stars, forks
+        return parse_repo_stats(response.text)
         
     except Exception as e:
         print(f"Error fetching repo stats for {repo_full_name}: {e}")
         return 0, 0
 
 
+def parse_repo_stats(html):
+    """
+    Parse total stars and forks count from a repository page's HTML.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Find stars count
+    stars = 0
+    stars_link = soup.find('a', href=lambda x: x and '/stargazers' in x)
+    if stars_link:
+        stars_text = stars_link.get_text(strip=True)
+        stars_match = re.search(r'([\d.]+)([kKmM])?', stars_text)
+        if stars_match:
+            num = float(stars_match.group(1))
+            suffix = stars_match.group(2)
+            if suffix:
+                if suffix.lower() == 'k':
+                    num *= 1000
+                elif suffix.lower() == 'm':
+                    num *= 1000000
+            stars = int(num)
+    
+    # Find forks count
+    forks = 0
+    forks_link = soup.find('a', href=lambda x: x and '/forks' in x)
+    if forks_link:
+        forks_text = forks_link.get_text(strip=True)
+        forks_match = re.search(r'([\d.]+)([kKmM])?', forks_text)
+        if forks_match:
+            num = float(forks_match.group(1))
+            suffix = forks_match.group(2)
+            if suffix:
+                if suffix.lower() == 'k':
+                    num *= 1000
+                elif suffix.lower() == 'm':
+                    num *= 1000000
+            forks = int(num)
+    
+    # Free the parse tree right away instead of waiting for the garbage collector
+    soup.decompose()
+    
+    return stars, forks
+
+
 def fetch_readme(repo_full_name):
     """
     Fetch README content from a GitHub repository.
@@ -172,7 +190,7 @@ def fetch_readme(repo_full_name):
         except Exception as e:
             continue
     
-    return "README not available"
+    return README_UNAVAILABLE
 
 
 def generate_summary(repos):
@@ -221,6 +239,38 @@ def save_to_json(data, filename='trending_summary.json'):
     print(f"Saved JSON to {filename}")
 
 
+def _digest_html(data):
+    """Render the rollups of a digest (most persistent, climbers, language share)."""
+    rollups = format_rollups(data)
+    
+    persistent = ''.join(f"            <li>{item}</li>\n" for item in rollups['most_persistent'])
+    climbers = ''.join(f"            <li>{item}</li>\n" for item in rollups['biggest_climbers'])
+    header = ''.join(f'<th>{lang}</th>' for lang in rollups['languages'])
+    rows = ''.join(
+        f"            <tr><td>{day}</td>" + ''.join(f"<td>{cell}</td>" for cell in cells) + "</tr>\n"
+        for day, cells in rollups['share_table']
+    )
+    
+    return f"""
+    <div class="insights">
+        <h2>📅 {rollups['title']}</h2>
+        <p><strong>Crawls:</strong> {rollups['crawls']} | <strong>Unique Repositories:</strong> {rollups['unique_repos']}</p>
+        <h3>Most Persistent</h3>
+        <ol>
+{persistent}        </ol>
+        <h3>Biggest Climbers</h3>
+        <ol>
+{climbers}        </ol>
+        <h3>Language Share</h3>
+        <p>{rollups['language_share']}</p>
+        <h3>Language Share by Day</h3>
+        <table>
+            <tr><th>Day</th>{header}</tr>
+{rows}        </table>
+    </div>
+"""
+
+
 def save_to_html(data, filename='trending_summary.html'):
     """Save summary data to HTML file."""
     html_content = f"""<!DOCTYPE html>
@@ -317,6 +367,12 @@ def save_to_html(data, filename='trending_summary.html'):
     </div>
 """
     
+    # Digests (see digest.py) carry period rollups and report gains over the period
+    gain_label = 'stars today'
+    if 'digest' in data:
+        gain_label = 'stars this period'
+        html_content += _digest_html(data)
+    
     for idx, repo in enumerate(data.get('repositories', []), 1):
         html_content += f"""
     <div class="repo-card">
@@ -327,7 +383,7 @@ def save_to_html(data, filename='trending_summary.html'):
         <div class="repo-stats">
             <div class="stat">⭐ <strong>{repo['total_stars']:,}</strong> stars</div>
             <div class="stat">🍴 <strong>{repo['forks']:,}</strong> forks</div>
-            <div class="stat">📈 <strong>{repo['stars_today']:,}</strong> stars today</div>
+            <div class="stat">📈 <strong>{repo['stars_today']:,}</strong> {gain_label}</div>
         </div>
         {f'<span class="language">{repo["language"]}</span>' if repo.get('language') else ''}
     </div>
@@ -342,10 +398,19 @@ def save_to_html(data, filename='trending_summary.html'):
     print(f"Saved HTML to {filename}")
 
 
-def main():
-    """Main execution function."""
+def main(site_dir=None, profile_dir=None, site_url=None):
+    """
+    Main execution function.
+    If site_dir is given, the crawl is also published to the static report site.
+    Sitemaps are only written when site_url (or TRENDING_SITE_URL) is set.
+    If profile_dir is given, each stage is profiled and reports are written there.
+    """
+    if profile_dir:
+        enable_profiling(profile_dir)
+    
     print("Fetching GitHub trending repositories...")
-    repos = fetch_trending_repos(limit=5)
+    with profile_stage('fetch_trending'):
+        repos = fetch_trending_repos(limit=5)
     
     if not repos:
         print("No repositories found.")
@@ -353,24 +418,82 @@ def main():
     
     print(f"\nFound {len(repos)} repositories. Fetching READMEs...")
     
-    for repo in repos:
-        print(f"  - {repo['name']}")
-        repo['readme'] = fetch_readme(repo['name'])
-        time.sleep(1)  # Be respectful with requests
+    with profile_stage('fetch_readmes'):
+        for repo in repos:
+            print(f"  - {repo['name']}")
+            repo['readme'] = fetch_readme(repo['name'])
+            time.sleep(1)  # Be respectful with requests
     
     print("\nGenerating summary...")
-    summary = generate_summary(repos)
+    with profile_stage('generate_summary'):
+        summary = generate_summary(repos)
     
     # Save to files
-    save_to_json(summary, 'trending_summary.json')
-    save_to_html(summary, 'trending_summary.html')
+    with profile_stage('save_outputs'):
+        save_to_json(summary, 'trending_summary.json')
+        save_to_html(summary, 'trending_summary.html')
+    
+    # History and search run after the report is saved so a failure here never loses it
+    print("\nStoring READMEs...")
+    try:
+        with profile_stage('store_readmes'):
+            stored = save_snapshot(repos, 'readme_store')
+        print(f"  snapshot {stored['snapshot']}: {stored['new_blobs']} new, {stored['reused_blobs']} unchanged")
+    except Exception as e:
+        print(f"Error storing READMEs: {e}")
+    
+    print("\nUpdating search index...")
+    try:
+        with profile_stage('index_repos'):
+            conn = open_index('trending_index.db')
+            try:
+                counts = index_repos(conn, repos)
+            finally:
+                conn.close()
+        print(f"  {counts['added']} added, {counts['updated']} updated, {counts['unchanged']} unchanged")
+    except Exception as e:
+        print(f"Error updating search index: {e}")
+    
+    try:
+        with profile_stage('record_history'):
+            record_crawl(summary, 'trending_history')
+    except Exception as e:
+        print(f"Error recording history: {e}")
+    
+    if site_dir:
+        try:
+            with profile_stage('publish_site'):
+                result = publish_crawl(
+                    summary, site_dir, site_url or os.getenv('TRENDING_SITE_URL', '')
+                )
+            print(f"Updated site {site_dir}: rendered {result['rendered']} pages, wrote {result['written']}")
+        except Exception as e:
+            print(f"Error publishing site: {e}")
     
     print("\n✅ Complete! Files saved:")
     print("  - trending_summary.json")
     print("  - trending_summary.html")
+    print("  - trending_index.db")
+    print("  - readme_store/")
+    print("  - trending_history/")
+    if profile_dir:
+        print(f"  - {profile_dir}/ (profiling reports)")
     
     return summary
 
 
 if __name__ == '__main__':
-    main()
+    import sys
+    
+    # Optional: python3 crawl_trending.py --site trending_site [--site-url URL] --profile profile_reports
+    site_dir = None
+    if '--site' in sys.argv:
+        site_dir = sys.argv[sys.argv.index('--site') + 1]
+    site_url = None
+    if '--site-url' in sys.argv:
+        site_url = sys.argv[sys.argv.index('--site-url') + 1]
+    profile_dir = None
+    if '--profile' in sys.argv:
+        profile_dir = sys.argv[sys.argv.index('--profile') + 1]
+    
+    main(site_dir=site_dir, profile_dir=profile_dir, site_url=site_url)
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Digest Builder for GitHub Trending History
+Builds daily, weekly or monthly rollups from saved crawl results without re-crawling.
+
+Every crawl is folded into a small per-day aggregate file
+(trending_history/days/YYYY-MM-DD.json), so a digest only has to merge
+one precomputed file per day in the period.
+"""
+
+import json
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+from storage import load_json, save_json
+
+
+DEFAULT_HISTORY = 'trending_history'
+# Periods are trailing windows ending on the digest's end date
+PERIOD_DAYS = {
+    'daily': 1,
+    'weekly': 7,
+    'monthly': 30
+}
+
+
+def _day_path(day, history_dir):
+    return os.path.join(history_dir, 'days', f'{day}.json')
+
+
+def load_day(day, history_dir=DEFAULT_HISTORY):
+    """Return the aggregate for a date (YYYY-MM-DD), or None if nothing was recorded."""
+    return load_json(_day_path(day, history_dir), None)
+
+
+def record_crawl(summary, history_dir=DEFAULT_HISTORY):
+    """
+    Fold a summary from generate_summary into its day's aggregate.
+    Recording the same crawl twice (same generated_at) has no effect.
+    Returns True if the aggregate was updated.
+    """
+    generated_at = summary.get('generated_at')
+    repos = summary.get('repositories', [])
+    if not generated_at or not repos:
+        return False
+
+    day = generated_at[:10]
+    aggregate = load_day(day, history_dir) or {
+        'date': day,
+        'crawls': [],
+        'repos': {},
+        'languages': {}
+    }
+    if generated_at in aggregate['crawls']:
+        return False
+    aggregate['crawls'].append(generated_at)
+
+    for repo in repos:
+        entry = aggregate['repos'].get(repo['name'])
+        if entry is None:
+            entry = {
+                'url': repo['url'],
+                'description': repo['description'],
+                'language': repo['language'],
+                'appearances': 0,
+                'stars_today': 0,
+                'first_total_stars': repo['total_stars'],
+                'total_stars': repo['total_stars'],
+                'forks': repo['forks']
+            }
+            aggregate['repos'][repo['name']] = entry
+            if repo['language']:
+                aggregate['languages'][repo['language']] = (
+                    aggregate['languages'].get(repo['language'], 0) + 1
+                )
+        entry['appearances'] += 1
+        entry['stars_today'] = max(entry['stars_today'], repo['stars_today'])
+        # fetch_repo_stats reports 0, 0 when it fails; keep the last real values
+        if repo['total_stars']:
+            entry['total_stars'] = repo['total_stars']
+            if not entry['first_total_stars']:
+                entry['first_total_stars'] = repo['total_stars']
+        if repo['forks']:
+            entry['forks'] = repo['forks']
+        entry['description'] = repo['description'] or entry['description']
+
+    save_json(_day_path(day, history_dir), aggregate, ensure_ascii=False)
+    return True
+
+
+def build_digest(period='weekly', end_date=None, history_dir=DEFAULT_HISTORY, limit=10):
+    """
+    Build a digest for the period ending on end_date (inclusive).
+
+    The result has the same shape as generate_summary output, so it can be
+    passed to save_to_json, save_to_html and create_email_body. For a digest,
+    'stars_today' holds the stars gained over the period. Digest-specific
+    rollups are under the 'digest' key.
+
+    Args:
+        period: 'daily', 'weekly' or 'monthly' (trailing 1, 7 or 30 days,
+                not calendar weeks or months)
+        end_date: Last day of the period as a date or YYYY-MM-DD (default: today)
+        history_dir: Directory written by record_crawl
+        limit: Number of repositories in each ranking
+    """
+    if period not in PERIOD_DAYS:
+        raise ValueError(f"Unknown period '{period}', expected one of {', '.join(PERIOD_DAYS)}")
+
+    if end_date is None:
+        end_date = date.today()
+    elif isinstance(end_date, str):
+        end_date = date.fromisoformat(end_date)
+    start_date = end_date - timedelta(days=PERIOD_DAYS[period] - 1)
+
+    repos = {}
+    language_share_by_day = {}
+    language_totals = {}
+    crawl_count = 0
+
+    day = start_date
+    while day <= end_date:
+        aggregate = load_day(day.isoformat(), history_dir)
+        day = day + timedelta(days=1)
+        if aggregate is None:
+            continue
+        crawl_count += len(aggregate['crawls'])
+
+        day_total = sum(aggregate['languages'].values())
+        if day_total:
+            language_share_by_day[aggregate['date']] = {
+                lang: round(count / day_total, 4)
+                for lang, count in aggregate['languages'].items()
+            }
+        for lang, count in aggregate['languages'].items():
+            language_totals[lang] = language_totals.get(lang, 0) + count
+
+        for name, entry in aggregate['repos'].items():
+            repo = repos.get(name)
+            if repo is None:
+                repo = {
+                    'name': name,
+                    'url': entry['url'],
+                    'description': entry['description'],
+                    'language': entry['language'],
+                    'days_trending': 0,
+                    'first_total_stars': entry['first_total_stars'],
+                    'best_stars_today': 0,
+                    'total_stars': entry['total_stars'],
+                    'forks': entry['forks']
+                }
+                repos[name] = repo
+            repo['days_trending'] += 1
+            repo['best_stars_today'] = max(repo['best_stars_today'], entry['stars_today'])
+            # Days whose stats could not be fetched hold 0; skip them
+            if entry['total_stars']:
+                repo['total_stars'] = entry['total_stars']
+                if not repo['first_total_stars']:
+                    repo['first_total_stars'] = entry['first_total_stars']
+            if entry['forks']:
+                repo['forks'] = entry['forks']
+            repo['description'] = entry['description'] or repo['description']
+
+    for repo in repos.values():
+        # Total stars may be missing (0) if stats could not be fetched
+        if repo['first_total_stars'] and repo['total_stars']:
+            repo['stars_gained'] = max(repo['total_stars'] - repo['first_total_stars'], 0)
+        else:
+            repo['stars_gained'] = 0
+        repo['stars_gained'] = max(repo['stars_gained'], repo['best_stars_today'])
+
+    most_persistent = sorted(
+        repos.values(),
+        key=lambda r: (r['days_trending'], r['stars_gained']),
+        reverse=True
+    )[:limit]
+    biggest_climbers = sorted(
+        repos.values(),
+        key=lambda r: r['stars_gained'],
+        reverse=True
+    )[:limit]
+
+    language_total = sum(language_totals.values())
+    language_share = {
+        lang: round(count / language_total, 4)
+        for lang, count in sorted(language_totals.items(), key=lambda item: -item[1])
+    } if language_total else {}
+
+    digest = {
+        'generated_at': datetime.now().isoformat(),
+        'period': period,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'total_repos': len(most_persistent),
+        'repositories': [
+            {
+                'name': r['name'],
+                'url': r['url'],
+                'description': r['description'],
+                'language': r['language'],
+                'stars_today': r['stars_gained'],
+                'total_stars': r['total_stars'],
+                'forks': r['forks'],
+                'readme_preview': ''
+            }
+            for r in most_persistent
+        ],
+        'digest': {
+            'crawls': crawl_count,
+            'unique_repos': len(repos),
+            'most_persistent': [
+                {'name': r['name'], 'days_trending': r['days_trending']}
+                for r in most_persistent
+            ],
+            'biggest_climbers': [
+                {'name': r['name'], 'stars_gained': r['stars_gained']}
+                for r in biggest_climbers
+            ],
+            'language_share': language_share,
+            'language_share_by_day': language_share_by_day
+        }
+    }
+
+    if language_share:
+        digest['insights'] = {
+            'most_common_language': next(iter(language_share)),
+            'total_stars': sum(r['total_stars'] for r in most_persistent),
+            'total_forks': sum(r['forks'] for r in most_persistent)
+        }
+
+    return digest
+
+
+def format_rollups(digest):
+    """
+    Format the rollups of a build_digest result as display strings.
+    Shared by save_to_html and create_email_body, which only add markup.
+    """
+    rollups = digest['digest']
+    languages = list(rollups['language_share'])
+
+    def share_text(share):
+        return ', '.join(f"{lang} {value:.1%}" for lang, value in share.items())
+
+    by_day = sorted(rollups['language_share_by_day'].items())
+    return {
+        'title': (
+            f"{digest.get('period', '').capitalize()} Digest: "
+            f"{digest.get('start_date')} to {digest.get('end_date')}"
+        ),
+        'crawls': rollups['crawls'],
+        'unique_repos': rollups['unique_repos'],
+        'most_persistent': [
+            f"{r['name']} ({r['days_trending']} day{'s' if r['days_trending'] != 1 else ''})"
+            for r in rollups['most_persistent']
+        ],
+        'biggest_climbers': [
+            f"{r['name']} (+{r['stars_gained']:,} stars)"
+            for r in rollups['biggest_climbers']
+        ],
+        'language_share': share_text(rollups['language_share']) or 'N/A',
+        'languages': languages,
+        'share_by_day': [(day, share_text(share)) for day, share in by_day],
+        'share_table': [
+            (day, [f"{share.get(lang, 0):.1%}" for lang in languages])
+            for day, share in by_day
+        ]
+    }
+
+
+def main():
+    """Command line entry point."""
+    usage = (
+        "Usage:\n"
+        "  python3 digest.py ingest trending_summary.json [...]\n"
+        "  python3 digest.py daily|weekly|monthly [YYYY-MM-DD]"
+    )
+    args = sys.argv[1:]
+    if not args or (args[0] != 'ingest' and args[0] not in PERIOD_DAYS):
+        print(usage)
+        return 1
+
+    if args[0] == 'ingest':
+        for path in args[1:]:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    summary = json.load(f)
+            except Exception as e:
+                print(f"Error loading {path}: {e}")
+                continue
+            if record_crawl(summary):
+                print(f"Recorded {path}")
+            else:
+                print(f"Skipped {path} (already recorded or empty)")
+        return 0
+
+    from crawl_trending import save_to_json, save_to_html
+
+    period = args[0]
+    end_date = args[1] if len(args) > 1 else None
+    digest = build_digest(period, end_date)
+    if not digest['repositories']:
+        print(f"No history recorded between {digest['start_date']} and {digest['end_date']}.")
+        return 1
+
+    save_to_json(digest, f'trending_digest_{period}.json')
+    save_to_html(digest, f'trending_digest_{period}.html')
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
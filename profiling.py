@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Profiling Hooks for the GitHub Trending Pipeline
+Wraps pipeline stages with CPU profiling (cProfile) and allocation tracking
+(tracemalloc), and checks stage reports against memory/time budgets.
+
+Profiling is opt-in: call enable_profiling(directory) or set
+TRENDING_PROFILE_DIR. Each stage then writes:
+    <directory>/<stage>.pstats        CPU profile (pstats / snakeviz format)
+    <directory>/<stage>.memory.json   peak memory and top allocation sites
+    <directory>/profile_report.json   summary of all stages in the run
+"""
+
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+TOP_ALLOCATIONS = 10
+
+_profile_dir = os.getenv('TRENDING_PROFILE_DIR') or None
+_reports = []
+_active = False
+# Highest traced memory seen by each active measurement, innermost last
+_peaks = []
+
+
+def enable_profiling(directory):
+    """Turn on profiling for subsequent stages, writing reports to directory."""
+    global _profile_dir
+    os.makedirs(directory, exist_ok=True)
+    _profile_dir = directory
+    _reports.clear()
+
+
+def disable_profiling():
+    """Turn off profiling."""
+    global _profile_dir
+    _profile_dir = None
+
+
+def is_enabled():
+    """Return True if stages are currently being profiled."""
+    return _profile_dir is not None
+
+
+@contextmanager
+def _measure(name):
+    """
+    Run a block under cProfile and tracemalloc and yield its report dict.
+
+    Measurements may nest (e.g. measure() inside a profiled stage). Only the
+    outermost one runs cProfile, and enclosing measurements still see the
+    peak memory of nested ones even though tracemalloc's peak is reset.
+    """
+    global _active
+    was_active = _active
+    report = {'stage': name}
+    profiler = None if was_active else cProfile.Profile()
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    # Hand the peak so far to the enclosing measurement before resetting it
+    _, peak = tracemalloc.get_traced_memory()
+    if _peaks:
+        _peaks[-1] = max(_peaks[-1], peak)
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    _peaks.append(baseline)
+
+    _active = True
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield report
+    finally:
+        if profiler:
+            profiler.disable()
+        report['seconds'] = round(time.perf_counter() - start, 6)
+        _active = was_active
+
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, _peaks.pop())
+        if _peaks:
+            _peaks[-1] = max(_peaks[-1], peak)
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        if started_tracing:
+            tracemalloc.stop()
+
+        report['peak_bytes'] = max(peak - baseline, 0)
+        report['retained_bytes'] = max(current - baseline, 0)
+        report['top_allocations'] = [
+            {'site': str(stat.traceback), 'bytes': stat.size, 'count': stat.count}
+            for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]
+        ]
+        report['profiler'] = profiler
+
+
+@contextmanager
+def profile_stage(name):
+    """
+    Profile a pipeline stage if profiling is enabled, otherwise do nothing.
+
+    Nested stages are not profiled separately; their cost is included in
+    the enclosing stage.
+    """
+    if _profile_dir is None or _active:
+        yield
+        return
+
+    with _measure(name) as report:
+        yield
+
+    os.makedirs(_profile_dir, exist_ok=True)
+    profiler = report.pop('profiler')
+    profiler.dump_stats(os.path.join(_profile_dir, f'{name}.pstats'))
+    with open(os.path.join(_profile_dir, f'{name}.memory.json'), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    _reports.append({
+        key: report[key] for key in ('stage', 'seconds', 'peak_bytes', 'retained_bytes')
+    })
+    with open(os.path.join(_profile_dir, 'profile_report.json'), 'w', encoding='utf-8') as f:
+        json.dump({'stages': _reports}, f, indent=2)
+
+
+def measure(func, *args, **kwargs):
+    """
+    Call func and return (result, report), whether or not profiling is enabled.
+    Inside a profiled stage this measures memory and time only, and the
+    stage's own report still includes the call. The report contains
+    'seconds', 'peak_bytes', 'retained_bytes' and 'top_allocations'; use it
+    with check_budget in tests.
+    """
+    with _measure(getattr(func, '__name__', 'call')) as report:
+        result = func(*args, **kwargs)
+    report.pop('profiler')
+    return result, report
+
+
+def check_budget(report, max_peak_mb=None, max_retained_mb=None, max_seconds=None):
+    """
+    Raise AssertionError if a stage report exceeds any of the given budgets.
+
+    Example:
+        _, report = measure(parse_many, pages)
+        check_budget(report, max_peak_mb=50)
+    """
+    failures = []
+    if max_peak_mb is not None and report['peak_bytes'] > max_peak_mb * 1024 * 1024:
+        failures.append(
+            f"peak memory {report['peak_bytes'] / 1024 / 1024:.1f} MB > {max_peak_mb} MB"
+        )
+    if max_retained_mb is not None and report['retained_bytes'] > max_retained_mb * 1024 * 1024:
+        failures.append(
+            f"retained memory {report['retained_bytes'] / 1024 / 1024:.1f} MB > {max_retained_mb} MB"
+        )
+    if max_seconds is not None and report['seconds'] > max_seconds:
+        failures.append(f"time {report['seconds']:.3f}s > {max_seconds}s")
+
+    if failures:
+        top = report.get('top_allocations', [])[:3]
+        sites = ''.join(f"\n  {a['bytes'] / 1024:.0f} KB at {a['site']}" for a in top)
+        raise AssertionError(
+            f"Stage '{report['stage']}' over budget: " + '; '.join(failures) + sites
+        )
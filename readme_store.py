@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+README Blob Store for GitHub Trending Crawls
+Stores README bodies content-addressed, compressed and deduplicated across crawls.
+
+Layout:
+    readme_store/objects/<2 hex>/<62 hex>   zlib-compressed README body
+    readme_store/snapshots/<id>.json        repo name -> blob hash for one crawl
+    readme_store/latest.json                most recent hash per repo
+"""
+
+import hashlib
+import os
+import sys
+import zlib
+from datetime import datetime
+
+from storage import README_UNAVAILABLE, atomic_write, load_json, save_json
+
+
+DEFAULT_STORE = 'readme_store'
+
+
+def blob_hash(content):
+    """Return the SHA-256 hex digest used as the address of a README body."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _blob_path(digest, store_dir):
+    return os.path.join(store_dir, 'objects', digest[:2], digest[2:])
+
+
+def put_readme(content, store_dir=DEFAULT_STORE):
+    """
+    Store a README body and return its hash.
+    Returns (digest, created) where created is False if the blob already existed.
+    """
+    digest = blob_hash(content)
+    path = _blob_path(digest, store_dir)
+    if os.path.exists(path):
+        return digest, False
+    atomic_write(path, zlib.compress(content.encode('utf-8'), 9))
+    return digest, True
+
+
+def get_readme(digest, store_dir=DEFAULT_STORE):
+    """Return the README body stored under digest, or None if it is missing."""
+    path = _blob_path(digest, store_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return zlib.decompress(f.read()).decode('utf-8')
+
+
+def has_changed(repo_full_name, content, store_dir=DEFAULT_STORE, latest=None):
+    """
+    Check whether a README differs from the last stored version for a repository.
+    Only hashes the content and compares it to latest.json; no blob is read.
+    """
+    if latest is None:
+        latest = load_json(os.path.join(store_dir, 'latest.json'), {})
+    return latest.get(repo_full_name) != blob_hash(content)
+
+
+def save_snapshot(repos, store_dir=DEFAULT_STORE, snapshot_id=None):
+    """
+    Store the READMEs of a crawl and record a snapshot referencing them.
+    Repositories without a README are left out of the snapshot.
+    Returns a dict with the snapshot id and counts of new and reused blobs.
+    """
+    snapshot_id = snapshot_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+    latest_path = os.path.join(store_dir, 'latest.json')
+    latest = load_json(latest_path, {})
+
+    refs = {}
+    new_blobs = 0
+    for repo in repos:
+        readme = repo.get('readme') or ''
+        if not readme or readme == README_UNAVAILABLE:
+            continue
+        digest, created = put_readme(readme, store_dir)
+        refs[repo['name']] = digest
+        latest[repo['name']] = digest
+        if created:
+            new_blobs += 1
+
+    snapshot = {
+        'created_at': datetime.now().isoformat(),
+        'readmes': refs
+    }
+    snapshot_path = os.path.join(store_dir, 'snapshots', f'{snapshot_id}.json')
+    save_json(snapshot_path, snapshot, indent=2)
+    save_json(latest_path, latest, indent=2, sort_keys=True)
+
+    return {
+        'snapshot': snapshot_id,
+        'new_blobs': new_blobs,
+        'reused_blobs': len(refs) - new_blobs
+    }
+
+
+def list_snapshots(store_dir=DEFAULT_STORE):
+    """Return snapshot ids in chronological order."""
+    snapshot_dir = os.path.join(store_dir, 'snapshots')
+    if not os.path.isdir(snapshot_dir):
+        return []
+    return sorted(
+        name[:-len('.json')] for name in os.listdir(snapshot_dir) if name.endswith('.json')
+    )
+
+
+def load_snapshot(snapshot_id, store_dir=DEFAULT_STORE):
+    """Return the repo name -> README body mapping recorded in a snapshot."""
+    path = os.path.join(store_dir, 'snapshots', f'{snapshot_id}.json')
+    snapshot = load_json(path, {'readmes': {}})
+    return {
+        name: get_readme(digest, store_dir)
+        for name, digest in snapshot['readmes'].items()
+    }
+
+
+def collect_garbage(store_dir=DEFAULT_STORE, keep_last=None):
+    """
+    Remove blobs that are no longer referenced by any snapshot.
+
+    Args:
+        store_dir: Blob store directory
+        keep_last: If set, delete all but the newest keep_last snapshots first
+
+    Returns the number of blobs removed.
+    """
+    snapshots = list_snapshots(store_dir)
+    if keep_last is not None and len(snapshots) > keep_last:
+        for snapshot_id in snapshots[:len(snapshots) - keep_last]:
+            os.remove(os.path.join(store_dir, 'snapshots', f'{snapshot_id}.json'))
+        snapshots = snapshots[len(snapshots) - keep_last:]
+
+    referenced = set()
+    for snapshot_id in snapshots:
+        path = os.path.join(store_dir, 'snapshots', f'{snapshot_id}.json')
+        referenced.update(load_json(path, {'readmes': {}})['readmes'].values())
+
+    # latest.json must only point at blobs that still exist
+    latest_path = os.path.join(store_dir, 'latest.json')
+    latest = load_json(latest_path, {})
+    pruned = {name: digest for name, digest in latest.items() if digest in referenced}
+    if pruned != latest:
+        save_json(latest_path, pruned, indent=2, sort_keys=True)
+
+    removed = 0
+    objects_dir = os.path.join(store_dir, 'objects')
+    if not os.path.isdir(objects_dir):
+        return removed
+    for prefix in os.listdir(objects_dir):
+        prefix_dir = os.path.join(objects_dir, prefix)
+        for rest in os.listdir(prefix_dir):
+            if rest.startswith('.tmp-'):
+                continue
+            if prefix + rest not in referenced:
+                os.remove(os.path.join(prefix_dir, rest))
+                removed += 1
+        if not os.listdir(prefix_dir):
+            os.rmdir(prefix_dir)
+
+    return removed
+
+
+def main():
+    """Command line entry point for garbage collection."""
+    keep_last = None
+    if len(sys.argv) > 1:
+        keep_last = int(sys.argv[1])
+
+    removed = collect_garbage(keep_last=keep_last)
+    print(f"Removed {removed} unreferenced README blobs")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
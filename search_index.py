@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Search Index for GitHub Trending Results
+Keeps collected READMEs and descriptions in a local SQLite FTS5 full-text index.
+"""
+
+import hashlib
+import json
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+from storage import README_UNAVAILABLE
+
+
+DEFAULT_INDEX = 'trending_index.db'
+
+
+def open_index(path=DEFAULT_INDEX):
+    """
+    Open (and create if needed) the full-text index database.
+    Returns a sqlite3 connection.
+    """
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS documents (
+            id INTEGER PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL,
+            url TEXT,
+            language TEXT,
+            content_hash TEXT NOT NULL,
+            first_seen TEXT NOT NULL,
+            last_seen TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS documents_last_seen ON documents(last_seen);
+        CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+            name, description, readme, tokenize='unicode61'
+        );
+    """)
+    return conn
+
+
+def content_hash(description, readme):
+    """Hash the indexed text of a repository so unchanged documents can be skipped."""
+    digest = hashlib.sha256()
+    digest.update(description.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(readme.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def index_repos(conn, repos, seen_at=None):
+    """
+    Incrementally index repositories from fetch_trending_repos / fetch_readme.
+    Only documents whose description or README changed are re-indexed;
+    unchanged ones just get their last_seen timestamp bumped. Indexing an
+    older summary only extends first_seen; the stored text and metadata are
+    kept. A summary's readme_preview never replaces an already indexed README.
+    Returns a dict with counts of added, updated and unchanged documents.
+    """
+    seen_at = seen_at or datetime.now().isoformat()
+    counts = {'added': 0, 'updated': 0, 'unchanged': 0}
+
+    with conn:
+        for repo in repos:
+            name = repo['name']
+            description = repo.get('description') or ''
+            # Live crawl results carry the full README, saved summaries only a preview
+            readme = repo.get('readme') or ''
+            is_preview = not readme
+            if is_preview:
+                readme = repo.get('readme_preview') or ''
+            if readme == README_UNAVAILABLE:
+                readme = ''
+
+            row = conn.execute(
+                "SELECT id, content_hash, last_seen FROM documents WHERE name = ?", (name,)
+            ).fetchone()
+            # Text and metadata from a summary older than the indexed one are stale
+            is_stale = row is not None and seen_at < row['last_seen']
+
+            if row and not is_stale and (is_preview or not readme):
+                # Keep the previously indexed README rather than wiping it
+                # or truncating it to a summary's 500-character preview
+                old = conn.execute(
+                    "SELECT readme FROM documents_fts WHERE rowid = ?", (row['id'],)
+                ).fetchone()
+                if old:
+                    readme = old['readme']
+
+            new_hash = None if is_stale else content_hash(description, readme)
+
+            if row is None:
+                cursor = conn.execute(
+                    """INSERT INTO documents
+                       (name, url, language, content_hash, first_seen, last_seen)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    (name, repo.get('url', ''), repo.get('language', ''),
+                     new_hash, seen_at, seen_at)
+                )
+                conn.execute(
+                    "INSERT INTO documents_fts (rowid, name, description, readme) VALUES (?, ?, ?, ?)",
+                    (cursor.lastrowid, name, description, readme)
+                )
+                counts['added'] += 1
+            elif not is_stale and row['content_hash'] != new_hash:
+                conn.execute(
+                    """UPDATE documents
+                       SET url = ?, language = ?, content_hash = ?, last_seen = ?
+                       WHERE id = ?""",
+                    (repo.get('url', ''), repo.get('language', ''), new_hash,
+                     seen_at, row['id'])
+                )
+                conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (row['id'],))
+                conn.execute(
+                    "INSERT INTO documents_fts (rowid, name, description, readme) VALUES (?, ?, ?, ?)",
+                    (row['id'], name, description, readme)
+                )
+                counts['updated'] += 1
+            else:
+                conn.execute(
+                    """UPDATE documents
+                       SET first_seen = MIN(first_seen, ?), last_seen = MAX(last_seen, ?)
+                       WHERE id = ?""",
+                    (seen_at, seen_at, row['id'])
+                )
+                counts['unchanged'] += 1
+
+    return counts
+
+
+def _to_match_query(query):
+    """Quote each search term so characters like '+' or '-' are not FTS5 syntax."""
+    terms = query.split()
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def search(conn, query, limit=20, since=None, language=None):
+    """
+    Search the index and return ranked matches with snippets.
+
+    Args:
+        conn: Connection returned by open_index
+        query: Search terms (all terms must match)
+        limit: Maximum number of results
+        since: Only include repos seen at or after this ISO timestamp
+        language: Only include repos with this programming language
+    """
+    match = _to_match_query(query)
+    if not match:
+        return []
+
+    sql = """
+        SELECT d.name, d.url, d.language, d.first_seen, d.last_seen,
+               bm25(documents_fts, 10.0, 5.0, 1.0) AS score,
+               snippet(documents_fts, -1, '[', ']', '...', 16) AS snippet
+        FROM documents_fts
+        JOIN documents d ON d.id = documents_fts.rowid
+        WHERE documents_fts MATCH ?
+    """
+    params = [match]
+    if since:
+        sql += " AND d.last_seen >= ?"
+        params.append(since)
+    if language:
+        sql += " AND d.language = ?"
+        params.append(language)
+    sql += " ORDER BY score LIMIT ?"
+    params.append(limit)
+
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    except sqlite3.OperationalError as e:
+        print(f"Error searching index: {e}")
+        return []
+
+    return [dict(row) for row in rows]
+
+
+def main():
+    """Command line entry point."""
+    usage = (
+        "Usage:\n"
+        "  python3 search_index.py index trending_summary.json [...]\n"
+        "  python3 search_index.py search QUERY [--days N]"
+    )
+    args = sys.argv[1:]
+    if len(args) < 2 or args[0] not in ('index', 'search'):
+        print(usage)
+        return 1
+
+    conn = open_index()
+
+    if args[0] == 'index':
+        for path in args[1:]:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    summary = json.load(f)
+            except Exception as e:
+                print(f"Error loading {path}: {e}")
+                continue
+            counts = index_repos(conn, summary.get('repositories', []),
+                                 summary.get('generated_at'))
+            print(f"{path}: {counts['added']} added, {counts['updated']} updated, "
+                  f"{counts['unchanged']} unchanged")
+        return 0
+
+    since = None
+    if '--days' in args:
+        pos = args.index('--days')
+        since = (datetime.now() - timedelta(days=int(args[pos + 1]))).isoformat()
+        args = args[:pos] + args[pos + 2:]
+
+    results = search(conn, ' '.join(args[1:]), since=since)
+    if not results:
+        print("No matches found.")
+    for idx, result in enumerate(results, 1):
+        print(f"{idx}. {result['name']} ({result['language'] or 'N/A'}) - last seen {result['last_seen']}")
+        print(f"   {result['snippet']}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
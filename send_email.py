@@ -13,6 +13,12 @@ from email.mime.base import MIMEBase
 from email import encoders
 from datetime import datetime
 
+from digest import format_rollups
+
+
+# Per-subscriber errors printed before only counting the rest
+MAX_REPORTED_FAILURES = 10
+
 
 def send_email(
     to_email,
@@ -129,44 +135,206 @@ def send_email(
         return False
 
 
-def create_email_body(summary_data):
-    """Create email body in both plain text and HTML formats."""
+def _render_insights(insights):
+    """Render the insights block in plain text and HTML."""
+    return {
+        'text': f"""
+Insights:
+- Most Common Language: {insights.get('most_common_language', 'N/A')}
+- Total Stars: {insights.get('total_stars', 0):,}
+- Total Forks: {insights.get('total_forks', 0):,}
+""",
+        'html': f"""
+        <div class="insights">
+            <h3>📊 Insights</h3>
+            <p><strong>Most Common Language:</strong> {insights.get('most_common_language', 'N/A')}</p>
+            <p><strong>Total Stars:</strong> {insights.get('total_stars', 0):,}</p>
+            <p><strong>Total Forks:</strong> {insights.get('total_forks', 0):,}</p>
+        </div>
+"""
+    }
+
+
+def _compute_insights(repos):
+    """Compute insights for a selection of repositories, like generate_summary does."""
+    languages = [r['language'] for r in repos if r.get('language')]
+    if not languages:
+        return None
+    return {
+        'most_common_language': max(set(languages), key=languages.count),
+        'total_stars': sum(r['total_stars'] for r in repos),
+        'total_forks': sum(r['forks'] for r in repos)
+    }
+
+
+def _render_digest(summary_data):
+    """Render the rollups of a digest (see digest.py) in plain text and HTML."""
+    rollups = format_rollups(summary_data)
     
-    repos = summary_data.get('repositories', [])
-    generated_at = summary_data.get('generated_at', 'N/A')
+    text = f"""
+{rollups['title']}
+- Crawls: {rollups['crawls']}, unique repositories: {rollups['unique_repos']}
+
+Most Persistent:
+"""
+    text += ''.join(
+        f"  {idx}. {item}\n" for idx, item in enumerate(rollups['most_persistent'], 1)
+    )
+    text += "\nBiggest Climbers:\n"
+    text += ''.join(
+        f"  {idx}. {item}\n" for idx, item in enumerate(rollups['biggest_climbers'], 1)
+    )
+    text += f"\nLanguage Share: {rollups['language_share']}\nLanguage Share by Day:\n"
+    text += ''.join(f"  {day}: {share}\n" for day, share in rollups['share_by_day'])
     
-    # Plain text version
-    text_body = f"""GitHub Trending Report
-Generated: {generated_at}
+    persistent = ''.join(f"                <li>{item}</li>\n" for item in rollups['most_persistent'])
+    climbers = ''.join(f"                <li>{item}</li>\n" for item in rollups['biggest_climbers'])
+    days = ''.join(f"                <li>{day}: {share}</li>\n" for day, share in rollups['share_by_day'])
+    html = f"""
+        <div class="insights">
+            <h3>📅 {rollups['title']}</h3>
+            <p><strong>Crawls:</strong> {rollups['crawls']} | <strong>Unique Repositories:</strong> {rollups['unique_repos']}</p>
+            <p><strong>Most Persistent:</strong></p>
+            <ol>
+{persistent}            </ol>
+            <p><strong>Biggest Climbers:</strong></p>
+            <ol>
+{climbers}            </ol>
+            <p><strong>Language Share:</strong> {rollups['language_share']}</p>
+            <p><strong>Language Share by Day:</strong></p>
+            <ul>
+{days}            </ul>
+        </div>
+"""
+    return {'text': text, 'html': html}
 
-Top {len(repos)} Trending Repositories:
 
-"""
+def render_fragments(summary_data):
+    """
+    Render the per-repository and insights fragments of a summary.
+
+    Render once per crawl and pass the result to create_email_body for every
+    personalized email. Repository fragments leave out the list number,
+    which differs per recipient.
+    """
+    fragments = {'repos': {}, 'insights': {'text': '', 'html': ''}}
     
-    for idx, repo in enumerate(repos, 1):
-        text_body += f"""
-{idx}. {repo['name']}
-   ⭐ Stars: {repo['total_stars']:,} (↑{repo['stars_today']:,} today)
+    # Digests report stars gained over the whole period
+    gain = 'this period' if 'digest' in summary_data else 'today'
+    
+    for repo in summary_data.get('repositories', []):
+        fragments['repos'][repo['name']] = {
+            'text': f"""{repo['name']}
+   ⭐ Stars: {repo['total_stars']:,} (↑{repo['stars_today']:,} {gain})
    🍴 Forks: {repo['forks']:,}
    🔧 Language: {repo.get('language', 'N/A')}
    📝 {repo['description']}
    🔗 {repo['url']}
 
+""",
+            'html': f"""{repo['name']}</div>
+            <p>{repo['description']}</p>
+            <div class="stats">
+                ⭐ <strong>{repo['total_stars']:,}</strong> stars (↑{repo['stars_today']:,} {gain}) | 
+                🍴 <strong>{repo['forks']:,}</strong> forks | 
+                🔧 {repo.get('language', 'N/A')}
+            </div>
+            <a href="{repo['url']}" target="_blank">View on GitHub →</a>
+        </div>
 """
+        }
     
     if 'insights' in summary_data:
-        insights = summary_data['insights']
-        text_body += f"""
-Insights:
-- Most Common Language: {insights.get('most_common_language', 'N/A')}
-- Total Stars: {insights.get('total_stars', 0):,}
-- Total Forks: {insights.get('total_forks', 0):,}
-"""
+        fragments['insights'] = _render_insights(summary_data['insights'])
+    
+    fragments['digest'] = {'text': '', 'html': ''}
+    if 'digest' in summary_data:
+        fragments['digest'] = _render_digest(summary_data)
+    
+    return fragments
+
+
+def validate_subscription(subscription):
+    """
+    Check a subscriber entry before use.
+    Raises ValueError describing the first problem found.
+    """
+    if not isinstance(subscription, dict):
+        raise ValueError(f"subscriber must be an object, got {type(subscription).__name__}")
+    email = subscription.get('email')
+    if not isinstance(email, str) or '@' not in email:
+        raise ValueError(f"invalid or missing email: {email!r}")
+    languages = subscription.get('languages')
+    if languages is not None and (
+        not isinstance(languages, list) or not all(isinstance(lang, str) for lang in languages)
+    ):
+        raise ValueError(f"{email}: languages must be a list of strings")
+    for key in ('min_stars', 'min_stars_today'):
+        value = subscription.get(key, 0)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{email}: {key} must be a number, got {value!r}")
+
+
+def matches_subscription(repo, subscription):
+    """
+    Check whether a repository matches a subscriber's filters.
+    
+    Supported filters (all optional):
+        languages: List of languages, matched case-insensitively
+        min_stars: Minimum total stars
+        min_stars_today: Minimum stars gained today
+    """
+    languages = subscription.get('languages')
+    if languages:
+        if (repo.get('language') or '').lower() not in {lang.lower() for lang in languages}:
+            return False
+    if repo['total_stars'] < subscription.get('min_stars', 0):
+        return False
+    if repo['stars_today'] < subscription.get('min_stars_today', 0):
+        return False
+    return True
+
+
+def create_email_body(summary_data, repos=None, fragments=None):
+    """
+    Create email body in both plain text and HTML formats.
+    If repos is given, only those repositories (e.g. a subscriber's
+    filtered selection) are listed and insights are computed for them.
+    fragments is the output of render_fragments(summary_data); pass it in
+    to reuse the rendering across many emails.
+    """
+    
+    if fragments is None:
+        fragments = render_fragments(summary_data)
+    if repos is None:
+        repos = summary_data.get('repositories', [])
+        insights = fragments['insights']
+    else:
+        selected_insights = _compute_insights(repos)
+        insights = (
+            _render_insights(selected_insights) if selected_insights
+            else {'text': '', 'html': ''}
+        )
+    generated_at = summary_data.get('generated_at', 'N/A')
+    
+    # Plain text version
+    text_parts = [f"""GitHub Trending Report
+Generated: {generated_at}
+
+Top {len(repos)} Trending Repositories:
+
+"""]
+    
+    for idx, repo in enumerate(repos, 1):
+        text_parts.append(f"\n{idx}. ")
+        text_parts.append(fragments['repos'][repo['name']]['text'])
     
-    text_body += "\n---\nSee attached files for full details."
+    text_parts.append(insights['text'])
+    text_parts.append(fragments['digest']['text'])
+    text_parts.append("\n---\nSee attached files for full details.")
     
     # HTML version
-    html_body = f"""<!DOCTYPE html>
+    html_parts = [f"""<!DOCTYPE html>
 <html>
 <head>
     <style>
@@ -186,46 +354,185 @@ Insights:
     </div>
     <div class="content">
         <h2>Top {len(repos)} Trending Repositories</h2>
-"""
+"""]
     
     for idx, repo in enumerate(repos, 1):
-        html_body += f"""
+        html_parts.append(f"""
         <div class="repo">
-            <div class="repo-title">{idx}. {repo['name']}</div>
-            <p>{repo['description']}</p>
-            <div class="stats">
-                ⭐ <strong>{repo['total_stars']:,}</strong> stars (↑{repo['stars_today']:,} today) | 
-                🍴 <strong>{repo['forks']:,}</strong> forks | 
-                🔧 {repo.get('language', 'N/A')}
-            </div>
-            <a href="{repo['url']}" target="_blank">View on GitHub →</a>
-        </div>
-"""
-    
-    if 'insights' in summary_data:
-        insights = summary_data['insights']
-        html_body += f"""
-        <div class="insights">
-            <h3>📊 Insights</h3>
-            <p><strong>Most Common Language:</strong> {insights.get('most_common_language', 'N/A')}</p>
-            <p><strong>Total Stars:</strong> {insights.get('total_stars', 0):,}</p>
-            <p><strong>Total Forks:</strong> {insights.get('total_forks', 0):,}</p>
-        </div>
-"""
+            <div class="repo-title">{idx}. """)
+        html_parts.append(fragments['repos'][repo['name']]['html'])
     
-    html_body += """
+    html_parts.append(insights['html'])
+    html_parts.append(fragments['digest']['html'])
+    html_parts.append("""
         <p style="color: #666; margin-top: 30px;">See attached files for full details including README previews.</p>
     </div>
 </body>
-</html>"""
+</html>""")
     
-    return {'text': text_body, 'html': html_body}
+    return {'text': ''.join(text_parts), 'html': ''.join(html_parts)}
+
+
+def send_personalized_emails(
+    subscribers,
+    json_file='trending_summary.json',
+    html_file='trending_summary.html',
+    smtp_server=None,
+    smtp_port=587,
+    sender_email=None,
+    sender_password=None
+):
+    """
+    Send each subscriber a report filtered to their interests.
+    
+    Repository fragments are rendered once for the crawl and reused for every
+    recipient, and all messages are sent over a single SMTP connection.
+    Invalid subscriber entries and refused recipients are reported and
+    counted without stopping the run.
+    
+    Args:
+        subscribers: List of dicts with 'email' and optional filters
+                     ('languages', 'min_stars', 'min_stars_today')
+        json_file: Path to JSON summary file
+        html_file: Path to HTML summary file
+        smtp_server: SMTP server address (e.g., 'smtp.gmail.com')
+        smtp_port: SMTP port (default: 587 for TLS)
+        sender_email: Sender's email address
+        sender_password: Sender's email password or app password
+    
+    Returns the number of emails sent (or saved as drafts).
+    """
+    
+    try:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            summary_data = json.load(f)
+    except Exception as e:
+        print(f"Error loading JSON: {e}")
+        return 0
+    
+    repos = summary_data.get('repositories', [])
+    fragments = render_fragments(summary_data)
+    
+    # Attachments are identical for every recipient, so encode them once
+    attachments = []
+    for path in (json_file, html_file):
+        try:
+            with open(path, 'rb') as f:
+                part = MIMEBase('application', 'octet-stream')
+                part.set_payload(f.read())
+                encoders.encode_base64(part)
+                part.add_header(
+                    'Content-Disposition',
+                    f'attachment; filename={os.path.basename(path)}'
+                )
+                attachments.append(part)
+        except Exception as e:
+            print(f"Error attaching {path}: {e}")
+    
+    subject = f"GitHub Trending Report - {datetime.now().strftime('%Y-%m-%d')}"
+    use_smtp = smtp_server and sender_email and sender_password
+    server = None
+    draft_dir = None
+    sent = 0
+    skipped = 0
+    
+    failed = 0
+    
+    try:
+        if use_smtp:
+            print(f"Connecting to {smtp_server}:{smtp_port}...")
+            server = smtplib.SMTP(smtp_server, smtp_port)
+            server.starttls()
+            server.login(sender_email, sender_password)
+        else:
+            draft_dir = f"email_drafts_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            os.makedirs(draft_dir, exist_ok=True)
+        
+        for subscriber in subscribers:
+            # One bad entry or refused recipient must not stop the rest
+            try:
+                validate_subscription(subscriber)
+                to_email = subscriber['email']
+                selected = [repo for repo in repos if matches_subscription(repo, subscriber)]
+                if not selected:
+                    skipped += 1
+                    continue
+                
+                email_body = create_email_body(summary_data, selected, fragments)
+                msg = MIMEMultipart('alternative')
+                msg['From'] = sender_email or 'github-trending@noreply.com'
+                msg['To'] = to_email
+                msg['Subject'] = subject
+                msg.attach(MIMEText(email_body['text'], 'plain'))
+                msg.attach(MIMEText(email_body['html'], 'html'))
+                for part in attachments:
+                    msg.attach(part)
+                
+                if server:
+                    server.send_message(msg)
+                else:
+                    draft_file = os.path.join(draft_dir, f"{to_email.replace('@', '_at_')}.eml")
+                    with open(draft_file, 'w', encoding='utf-8') as f:
+                        f.write(msg.as_string())
+                sent += 1
+            except Exception as e:
+                failed += 1
+                if failed <= MAX_REPORTED_FAILURES:
+                    print(f"❌ Error for subscriber {subscriber!r}: {e}")
+        
+        if server:
+            print(f"✅ Sent {sent} personalized emails")
+        else:
+            print(f"⚠️  SMTP credentials not provided.")
+            print(f"📧 {sent} email drafts saved to: {draft_dir}")
+        if skipped:
+            print(f"   Skipped {skipped} subscribers with no matching repositories")
+        if failed:
+            print(f"   Failed for {failed} subscribers")
+    
+    except Exception as e:
+        print(f"❌ Error sending personalized emails: {e}")
+    
+    finally:
+        if server:
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+    
+    return sent
 
 
 def main():
     """Main execution function."""
     import sys
     
+    # Get SMTP settings from environment variables
+    smtp_server = os.getenv('SMTP_SERVER')  # e.g., 'smtp.gmail.com'
+    sender_email = os.getenv('SMTP_EMAIL')
+    sender_password = os.getenv('SMTP_PASSWORD')
+    
+    # Personalized reports: python3 send_email.py --subscribers subscribers.json
+    if len(sys.argv) > 2 and sys.argv[1] == '--subscribers':
+        try:
+            with open(sys.argv[2], 'r', encoding='utf-8') as f:
+                subscribers = json.load(f)
+        except Exception as e:
+            print(f"Error loading subscribers: {e}")
+            return 1
+        if not isinstance(subscribers, list):
+            print("Error loading subscribers: expected a JSON list")
+            return 1
+        
+        print(f"Preparing personalized emails for {len(subscribers)} subscribers")
+        sent = send_personalized_emails(
+            subscribers,
+            smtp_server=smtp_server,
+            sender_email=sender_email,
+            sender_password=sender_password
+        )
+        return 0 if sent else 1
+    
     # Default recipient
     to_email = 'yqing999@gmail.com'
     
@@ -239,11 +546,6 @@ def main():
     print("  1. Set environment variables: SMTP_SERVER, SMTP_EMAIL, SMTP_PASSWORD")
     print("  2. Or the script will save an .eml file you can send manually\n")
     
-    # Get SMTP settings from environment variables
-    smtp_server = os.getenv('SMTP_SERVER')  # e.g., 'smtp.gmail.com'
-    sender_email = os.getenv('SMTP_EMAIL')
-    sender_password = os.getenv('SMTP_PASSWORD')
-    
     success = send_email(
         to_email=to_email,
         smtp_server=smtp_server,
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Static Report Site for GitHub Trending
+Publishes crawl results as a browsable archive: a page per day, a page per
+repository, an index page per language and a monthly archive.
+
+Only pages affected by a crawl are re-rendered, and a page is only written
+when its content changed. Per-page state lives in small JSON files under
+_data/, so publish time depends on the size of the crawl, not the archive.
+
+Layout:
+    index.html                  recent days, languages and months
+    days/YYYY-MM-DD.html        repositories trending on a day
+    repos/<owner>__<name>.html  trending history of a repository
+    languages/<language>.html   repositories per language
+    archive/YYYY-MM.html        days recorded in a month
+    sitemap.xml                 sitemap index of sitemaps/YYYY-MM.xml
+"""
+
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+
+from storage import atomic_write, load_json, save_json
+
+
+DEFAULT_SITE = 'trending_site'
+RECENT_DAYS = 30
+
+STYLE = """
+        body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
+               max-width: 1200px; margin: 0 auto; padding: 20px; background-color: #f6f8fa; }
+        h1 { color: #24292e; border-bottom: 2px solid #0366d6; padding-bottom: 10px; }
+        a { color: #0366d6; text-decoration: none; }
+        a:hover { text-decoration: underline; }
+        nav { margin-bottom: 20px; }
+        .repo-card { background: white; border: 1px solid #e1e4e8; border-radius: 6px;
+                     padding: 15px 20px; margin: 15px 0; }
+        .repo-stats { color: #586069; }
+        .language { display: inline-block; padding: 2px 10px; background: #0366d6;
+                    color: white; border-radius: 12px; font-size: 13px; }
+        table { border-collapse: collapse; background: white; }
+        td, th { border: 1px solid #e1e4e8; padding: 6px 12px; text-align: left; }
+"""
+
+
+def _slug(value):
+    """Turn a repository or language name into a safe file name."""
+    value = value.replace('/', '__')
+    return re.sub(r'[^A-Za-z0-9_.-]', lambda m: f'-{ord(m.group(0)):x}-', value) or 'unknown'
+
+
+def _save_json(path, data):
+    save_json(path, data, ensure_ascii=False, sort_keys=True)
+
+
+def _page(title, body, depth):
+    """Wrap page content in the shared layout. depth is the page's directory depth."""
+    root = '../' * depth
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{html.escape(title)}</title>
+    <style>{STYLE}    </style>
+</head>
+<body>
+    <nav><a href="{root}index.html">🔥 GitHub Trending Archive</a></nav>
+    <h1>{html.escape(title)}</h1>
+{body}
+</body>
+</html>"""
+
+
+def _repo_card(name, repo, root):
+    language = repo.get('language')
+    language_html = (
+        f'<a class="language" href="{root}languages/{_slug(language)}.html">{html.escape(language)}</a>'
+        if language else ''
+    )
+    return f"""
+    <div class="repo-card">
+        <a href="{root}repos/{_slug(name)}.html"><strong>{html.escape(name)}</strong></a>
+        (<a href="{html.escape(repo['url'])}" target="_blank">GitHub</a>)
+        <p>{html.escape(repo.get('description') or '')}</p>
+        <div class="repo-stats">
+            ⭐ <strong>{repo['total_stars']:,}</strong> stars |
+            🍴 <strong>{repo['forks']:,}</strong> forks |
+            📈 <strong>{repo['stars_today']:,}</strong> stars today
+        </div>
+        {language_html}
+    </div>"""
+
+
+def _render_day(day, data):
+    repos = sorted(data['repos'].items(), key=lambda item: -item[1]['stars_today'])
+    body = ''.join(_repo_card(name, repo, '../') for name, repo in repos)
+    return _page(f'GitHub Trending - {day}', body, 1)
+
+
+def _render_repo(name, data):
+    info = data['info']
+    rows = ''.join(
+        f'        <tr><td><a href="../days/{day}.html">{day}</a></td><td>{stars:,}</td></tr>\n'
+        for day, stars in sorted(data['days'].items(), reverse=True)
+    )
+    language = info.get('language')
+    body = f"""
+    <p>{html.escape(info.get('description') or '')}</p>
+    <p><a href="{html.escape(info['url'])}" target="_blank">View on GitHub →</a></p>
+    <p class="repo-stats">⭐ <strong>{info['total_stars']:,}</strong> stars |
+        🍴 <strong>{info['forks']:,}</strong> forks |
+        🔧 {f'<a href="../languages/{_slug(language)}.html">{html.escape(language)}</a>' if language else 'N/A'}</p>
+    <h2>Days trending ({len(data['days'])})</h2>
+    <table>
+        <tr><th>Day</th><th>Stars today</th></tr>
+{rows}    </table>"""
+    return _page(name, body, 1)
+
+
+def _render_language(language, data):
+    repos = sorted(data['repos'].items(), key=lambda item: item[1], reverse=True)
+    items = ''.join(
+        f'        <li><a href="../repos/{_slug(name)}.html">{html.escape(name)}</a> '
+        f'(last trending <a href="../days/{day}.html">{day}</a>)</li>\n'
+        for name, day in repos
+    )
+    return _page(f'{language} repositories', f'    <ul>\n{items}    </ul>', 1)
+
+
+def _render_month(month, data):
+    items = ''.join(
+        f'        <li><a href="../days/{day}.html">{day}</a></li>\n'
+        for day in sorted(data['days'], reverse=True)
+    )
+    return _page(f'Archive {month}', f'    <ul>\n{items}    </ul>', 1)
+
+
+def _render_index(site):
+    recent = ''.join(
+        f'        <li><a href="days/{day}.html">{day}</a></li>\n'
+        for day in site['recent_days']
+    )
+    languages = ''.join(
+        f'        <li><a href="languages/{slug}.html">{html.escape(name)}</a></li>\n'
+        for slug, name in sorted(site['languages'].items(), key=lambda item: item[1].lower())
+    )
+    months = ''.join(
+        f'        <li><a href="archive/{month}.html">{month}</a></li>\n'
+        for month in sorted(site['months'], reverse=True)
+    )
+    body = f"""
+    <h2>Recent days</h2>
+    <ul>
+{recent}    </ul>
+    <h2>Languages</h2>
+    <ul>
+{languages}    </ul>
+    <h2>Archive</h2>
+    <ul>
+{months}    </ul>"""
+    return _page('GitHub Trending Archive', body, 0)
+
+
+def publish_crawl(summary, site_dir=DEFAULT_SITE, base_url=''):
+    """
+    Add a crawl summary to the static site, re-rendering only affected pages.
+
+    Args:
+        summary: Output of generate_summary (or a saved trending_summary.json)
+        site_dir: Output directory of the site
+        base_url: Absolute URL the site is served from. Sitemaps require
+                  absolute URLs, so none are written without it.
+
+    Returns a dict with the number of pages rendered and actually written.
+    """
+    generated_at = summary.get('generated_at')
+    repos = summary.get('repositories', [])
+    if not generated_at or not repos:
+        return {'rendered': 0, 'written': 0}
+
+    day = generated_at[:10]
+    month = day[:7]
+    data_dir = os.path.join(site_dir, '_data')
+    site_path = os.path.join(data_dir, 'site.json')
+    site = load_json(site_path, {'recent_days': [], 'languages': {}, 'months': []})
+
+    # Each entry: page path -> (state file path, state, render function)
+    dirty = {}
+
+    day_state_path = os.path.join(data_dir, 'days', f'{day}.json')
+    day_state = load_json(day_state_path, {'repos': {}})
+    for repo in repos:
+        day_state['repos'][repo['name']] = {
+            key: repo[key]
+            for key in ('url', 'description', 'language', 'stars_today', 'total_stars', 'forks')
+        }
+    dirty[f'days/{day}.html'] = (day_state_path, day_state, lambda s: _render_day(day, s))
+
+    for repo in repos:
+        name = repo['name']
+        repo_state_path = os.path.join(data_dir, 'repos', f'{_slug(name)}.json')
+        repo_state = load_json(repo_state_path, {'days': {}})
+        repo_state['info'] = {
+            key: repo[key] for key in ('url', 'description', 'language', 'total_stars', 'forks')
+        }
+        repo_state['days'][day] = max(repo_state['days'].get(day, 0), repo['stars_today'])
+        dirty[f'repos/{_slug(name)}.html'] = (
+            repo_state_path, repo_state, lambda s, name=name: _render_repo(name, s)
+        )
+
+        language = repo['language']
+        if not language:
+            continue
+        page = f'languages/{_slug(language)}.html'
+        if page not in dirty:
+            lang_state_path = os.path.join(data_dir, 'languages', f'{_slug(language)}.json')
+            lang_state = load_json(lang_state_path, {'repos': {}})
+            dirty[page] = (
+                lang_state_path, lang_state,
+                lambda s, language=language: _render_language(language, s)
+            )
+            site['languages'][_slug(language)] = language
+        dirty[page][1]['repos'][name] = day
+
+    month_state_path = os.path.join(data_dir, 'months', f'{month}.json')
+    month_state = load_json(month_state_path, {'days': [], 'sitemap': {}})
+    if day not in month_state['days']:
+        month_state['days'].append(day)
+        dirty[f'archive/{month}.html'] = (
+            month_state_path, month_state, lambda s: _render_month(month, s)
+        )
+
+    if day not in site['recent_days']:
+        site['recent_days'] = sorted(site['recent_days'] + [day], reverse=True)[:RECENT_DAYS]
+    months_changed = month not in site['months']
+    if months_changed:
+        site['months'].append(month)
+    dirty['index.html'] = (site_path, site, _render_index)
+
+    # Render dirty pages and write those whose content changed
+    lastmod = generated_at[:10]
+    sitemap_shards = {month: month_state}
+    written = 0
+    for page, (state_path, state, render) in dirty.items():
+        content = render(state)
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        record = state.setdefault('page', {'shard': month})
+        if record.get('hash') != digest:
+            atomic_write(os.path.join(site_dir, page), content)
+            record['hash'] = digest
+            written += 1
+            shard = record['shard']
+            if shard not in sitemap_shards:
+                sitemap_shards[shard] = load_json(
+                    os.path.join(data_dir, 'months', f'{shard}.json'), {'days': [], 'sitemap': {}}
+                )
+            sitemap_shards[shard]['sitemap'][page] = lastmod
+        if state is not site and state is not month_state:
+            _save_json(state_path, state)
+
+    # Lastmod dates are always tracked so sitemaps can be written once a base URL is set
+    index_path = os.path.join(site_dir, 'sitemap.xml')
+    if not base_url:
+        for shard, shard_state in sitemap_shards.items():
+            _save_json(os.path.join(data_dir, 'months', f'{shard}.json'), shard_state)
+        _save_json(site_path, site)
+        return {'rendered': len(dirty), 'written': written}
+
+    # Only sitemap shards containing written pages are regenerated, unless
+    # there is no sitemap yet (e.g. the base URL was only just configured)
+    if not os.path.exists(index_path):
+        for shard in site['months']:
+            if shard not in sitemap_shards:
+                sitemap_shards[shard] = load_json(
+                    os.path.join(data_dir, 'months', f'{shard}.json'), {'days': [], 'sitemap': {}}
+                )
+    base = base_url.rstrip('/') + '/'
+    for shard, shard_state in sitemap_shards.items():
+        urls = ''.join(
+            f'  <url><loc>{html.escape(base + page)}</loc><lastmod>{mod}</lastmod></url>\n'
+            for page, mod in sorted(shard_state['sitemap'].items())
+        )
+        atomic_write(
+            os.path.join(site_dir, 'sitemaps', f'{shard}.xml'),
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            f'{urls}</urlset>\n'
+        )
+        _save_json(os.path.join(data_dir, 'months', f'{shard}.json'), shard_state)
+
+    if months_changed or not os.path.exists(index_path):
+        entries = ''.join(
+            f'  <sitemap><loc>{html.escape(base)}sitemaps/{m}.xml</loc></sitemap>\n'
+            for m in sorted(site['months'])
+        )
+        atomic_write(
+            index_path,
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            f'{entries}</sitemapindex>\n'
+        )
+    _save_json(site_path, site)
+
+    return {'rendered': len(dirty), 'written': written}
+
+
+def main():
+    """Publish saved summaries: python3 static_site.py trending_summary.json [...]"""
+    if len(sys.argv) < 2:
+        print("Usage: python3 static_site.py trending_summary.json [...]")
+        return 1
+
+    for path in sys.argv[1:]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+        except Exception as e:
+            print(f"Error loading {path}: {e}")
+            continue
+        result = publish_crawl(summary, DEFAULT_SITE, os.getenv('TRENDING_SITE_URL', ''))
+        print(f"{path}: rendered {result['rendered']} pages, wrote {result['written']}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
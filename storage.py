@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Shared Storage Helpers for GitHub Trending
+Atomic file writes and JSON loading used by the history, README store and
+static site modules.
+"""
+
+import json
+import os
+import tempfile
+
+
+# Placeholder returned by fetch_readme when no README could be fetched
+README_UNAVAILABLE = 'README not available'
+
+
+def atomic_write(path, data):
+    """
+    Write str or bytes to path via a temporary file in the same directory and
+    rename it into place, so readers never see a partial file. The temporary
+    file is removed if writing fails.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        if isinstance(data, bytes):
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+        else:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_json(path, default):
+    """Load a JSON file, returning default if it does not exist."""
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_json(path, data, **kwargs):
+    """Serialize data to JSON and write it atomically. kwargs go to json.dumps."""
+    atomic_write(path, json.dumps(data, **kwargs))
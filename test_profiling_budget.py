@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Memory budget tests for the GitHub Trending crawler
+Parses fixture repository pages under profiling.measure and fails if
+peak or retained memory goes over budget, so memory regressions break the build.
+"""
+
+import os
+
+from crawl_trending import parse_repo_stats
+from profiling import measure, check_budget
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PAGE_COUNT = 250
+
+# Budgets for parsing PAGE_COUNT repository pages
+MAX_PEAK_MB = 10
+MAX_RETAINED_MB = 1
+
+
+def load_repo_page():
+    """Load the fixture repository page."""
+    with open(os.path.join(FIXTURE_DIR, 'repo_page.html'), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def parse_pages(pages):
+    """Parse every page and return the (stars, forks) results."""
+    return [parse_repo_stats(page) for page in pages]
+
+
+def test_parse_repo_stats_fixture():
+    """The fixture page parses to the expected counts."""
+    assert parse_repo_stats(load_repo_page()) == (15200, 2500)
+
+
+def test_parse_repo_pages_memory_budget():
+    """Parsing many repository pages stays within the memory budget."""
+    pages = [load_repo_page()] * PAGE_COUNT
+    results, report = measure(parse_pages, pages)
+
+    assert len(results) == PAGE_COUNT
+    check_budget(report, max_peak_mb=MAX_PEAK_MB, max_retained_mb=MAX_RETAINED_MB)
+
+
+def test_check_budget_reports_overrun():
+    """A report over budget raises AssertionError naming the stage."""
+    _, report = measure(bytearray, 2 * 1024 * 1024)
+    try:
+        check_budget(report, max_peak_mb=1)
+    except AssertionError as e:
+        assert "'bytearray' over budget" in str(e)
+    else:
+        raise AssertionError("check_budget did not fail")
+
+
+if __name__ == '__main__':
+    test_parse_repo_stats_fixture()
+    test_parse_repo_pages_memory_budget()
+    test_check_budget_reports_overrun()
+    print("✅ Memory budgets met")